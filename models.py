@@ -1,11 +1,11 @@
 from dataclasses import dataclass
 from datetime import date, datetime
-from typing import Optional
+from typing import ClassVar, Optional
 
 from utilities import count_search_query, is_there_any_money_amount, string_has_value
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Article:
     title: str
     description: str
@@ -22,24 +22,25 @@ class Article:
     def publication_month(self):
         return self.published_at.replace(day=1).date()
 
-    def __hash__(self) -> int:
-        return hash((self.title, self.published_at.isoformat()))
-
-    def __eq__(self, other) -> bool:
-        return self.title == other.title and self.published_at == other.published_at
+    @property
+    def key(self) -> tuple[str, datetime]:
+        """The title and publication datetime, which identify an article across search result pages."""
+        return (self.title, self.published_at)
 
     def count_search_query_occurrences(self, search_query: str) -> int:
         """Count the number of occurrences of the search query in the article title and description."""
-        title_count = count_search_query(self.title, search_query)
-        description_count = count_search_query(self.description, search_query)
-        return title_count + description_count
+        # Title and description are joined to lowercase and scan a single string.
+        # The line break between them keeps a single-line query from matching across both.
+        return count_search_query(f"{self.title}\n{self.description}", search_query)
 
     def is_there_any_money_amount(self) -> bool:
         """Check if there is any money amount in the article title or description."""
-        return is_there_any_money_amount(self.title) or is_there_any_money_amount(self.description)
+        # Title and description are joined to scan a single string. Two line breaks are more whitespace than a money
+        # amount allows between a number and its currency, so no amount can span both.
+        return is_there_any_money_amount(f"{self.title}\n\n{self.description}")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OutputRow:
     """Output row to be saved in an Excel file."""
 
@@ -54,6 +55,19 @@ class OutputRow:
     category: str
     months: int
 
+    # Column names of the Excel file.
+    HEADER: ClassVar[tuple[str, ...]] = (
+        "Title",
+        "Date",
+        "Description",
+        "Picture filename",
+        "Search phrase count",
+        "Contains money",
+        "Search query",
+        "Category",
+        "Months",
+    )
+
     def __post_init__(self):
         assert string_has_value(self.title)
         assert isinstance(self.date, date)
@@ -65,15 +79,16 @@ class OutputRow:
         assert self.category is None or string_has_value(self.category)
         assert isinstance(self.months, int) and self.months >= 1
 
-    def to_dict(self):
-        return {
-            "Title": self.title,
-            "Date": self.date.isoformat(),
-            "Description": self.description,
-            "Picture filename": self.picture_filename,
-            "Search phrase count": self.search_phrase_count,
-            "Contains money": self.contains_money,
-            "Search query": self.search_query,
-            "Category": self.category,
-            "Months": self.months,
-        }
+    def to_row(self) -> tuple:
+        """Values of the row, in the same order as the HEADER columns."""
+        return (
+            self.title,
+            self.date.isoformat(),
+            self.description,
+            self.picture_filename,
+            self.search_phrase_count,
+            self.contains_money,
+            self.search_query,
+            self.category,
+            self.months,
+        )
@@ -0,0 +1,83 @@
+from datetime import date, datetime
+
+from zoneinfo import ZoneInfo
+
+from models import Article, OutputRow
+
+
+def make_article(**kwargs) -> Article:
+    fields = {
+        "title": "Title",
+        "description": "Description",
+        "published_at": datetime(2024, 8, 15, 21, 28, tzinfo=ZoneInfo("UTC")),
+    }
+    fields.update(kwargs)
+    return Article(**fields)
+
+
+def test_article_publication_date_and_month():
+    article = make_article()
+
+    assert article.publication_date == date(2024, 8, 15)
+    assert article.publication_month == date(2024, 8, 1)
+
+
+def test_article_key():
+    article = make_article()
+
+    # Articles with the same title and publication datetime have the same key
+    assert article.key == make_article(category="Food", image_filepath="output/image.jpg").key
+
+    assert article.key != make_article(title="Another title").key
+    assert article.key != make_article(published_at=datetime(2024, 8, 16, tzinfo=ZoneInfo("UTC"))).key
+
+
+def test_article_equality():
+    article = make_article()
+
+    assert article == make_article()
+    assert len({article, make_article()}) == 1
+
+    assert article != make_article(image_filepath="output/image.jpg")
+
+
+def test_article_count_search_query_occurrences():
+    article = make_article(title="Meal prep for the week", description="A meal a day, or two MEALS")
+
+    assert article.count_search_query_occurrences("meal") == 3
+    assert article.count_search_query_occurrences("Meal Prep") == 1
+    assert article.count_search_query_occurrences("week a meal") == 0
+    assert article.count_search_query_occurrences("dinner") == 0
+
+
+def test_article_is_there_any_money_amount():
+    assert make_article(title="Lunch for $5").is_there_any_money_amount()
+    assert make_article(description="A meal for 10 dollars").is_there_any_money_amount()
+    assert not make_article(title="Top 10", description="Dollars and cents").is_there_any_money_amount()
+    assert not make_article(title="Top 10", description="USD rates").is_there_any_money_amount()
+
+
+def test_output_row_to_row():
+    output_row = OutputRow(
+        title="Title",
+        date=date(2024, 8, 15),
+        description="Description",
+        picture_filename="output/image.jpg",
+        search_phrase_count=2,
+        contains_money=True,
+        search_query="meal",
+        category=None,
+        months=1,
+    )
+
+    assert output_row.to_row() == (
+        "Title",
+        "2024-08-15",
+        "Description",
+        "output/image.jpg",
+        2,
+        True,
+        "meal",
+        None,
+        1,
+    )
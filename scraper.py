@@ -1,28 +1,115 @@
+import hashlib
 import logging
-import random
-import string
-from datetime import datetime
+import secrets
+import shutil
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from datetime import date, datetime
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
 from RPA.core.webdriver import start
 from selenium import webdriver
 from selenium.common.exceptions import (
     ElementClickInterceptedException,
     NoSuchElementException,
     StaleElementReferenceException,
+    TimeoutException,
 )
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.select import Select
 from selenium.webdriver.support.ui import WebDriverWait
 from zoneinfo import ZoneInfo
 
 from models import Article
 from utilities import is_there_any_stale_web_element
 
+# Timezone of the article timestamps.
+UTC = ZoneInfo("UTC")
+
+# Maximum size, in bytes, of the Chrome disk cache.
+CHROME_DISK_CACHE_SIZE = 100 * 1024 * 1024
+
+# Interval, in seconds, between checks of the page while waiting for it.
+# Lower than the WebDriverWait default of 0.5s, so the scraper moves on as soon as the page is ready.
+WAIT_POLL_FREQUENCY = 0.05
+
+# Maximum number of concurrent image downloads.
+IMAGE_DOWNLOAD_WORKERS = 16
+
+# Timeout, in seconds, to connect to the image server and between received bytes.
+IMAGE_DOWNLOAD_TIMEOUT = 10
+
+# JavaScript function that reads the fields of a search result article in the browser.
+EXTRACT_ARTICLE_FIELDS_JS = """
+function (article) {
+    const text = (selector) => {
+        const element = article.querySelector(selector);
+        return element ? element.textContent.trim() : null;
+    };
+    const attribute = (selector, name) => {
+        const element = article.querySelector(selector);
+        return element ? element.getAttribute(name) : null;
+    };
+    return {
+        category: text(".promo-category"),
+        title: text(".promo-title"),
+        description: text(".promo-description"),
+        timestamp: attribute(".promo-timestamp", "data-timestamp"),
+        image_url: attribute("img", "src"),
+    };
+}
+"""
+
+# JavaScript async script that resolves once an element matching a selector is present, or after a timeout.
+WAIT_FOR_ELEMENT_PRESENT_JS = """
+const [selector, timeoutMs, done] = arguments;
+if (document.querySelector(selector)) {
+    done(true);
+    return;
+}
+const observer = new MutationObserver(() => {
+    if (document.querySelector(selector)) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(true);
+    }
+});
+const timer = setTimeout(() => {
+    observer.disconnect();
+    done(false);
+}, timeoutMs);
+observer.observe(document, { childList: true, subtree: true });
+"""
+
+# JavaScript script that selects the option of a select element by its text and dispatches the change event.
+SELECT_OPTION_BY_TEXT_JS = """
+const [select, text] = arguments;
+const option = Array.from(select.options).find((option) => option.text.trim() === text);
+if (!option) {
+    return false;
+}
+select.value = option.value;
+select.dispatchEvent(new Event("input", { bubbles: true }));
+select.dispatchEvent(new Event("change", { bubbles: true }));
+return true;
+"""
+
+# JavaScript script that returns the number of next page buttons, the first one if it is active, and the search
+# results, so the current page can be told apart from the next one.
+FIND_NEXT_PAGE_BUTTON_JS = """
+const buttons = document.querySelectorAll(".search-results-module-next-page");
+const button = buttons[0];
+const icon = button ? button.querySelector("svg") : null;
+const active = Boolean(button) && !(icon && icon.getAttribute("data-inactive"));
+return [buttons.length, active ? button : null, document.querySelector(".search-results-module-results-menu")];
+"""
+
 
 class ArticleParseError(Exception):
     pass
@@ -31,10 +118,21 @@ class ArticleParseError(Exception):
 class LATimesScraper:
     """A class to scrape articles from the LA Times website."""
 
-    def __init__(self, homepage_url: str = "https://www.latimes.com/") -> None:
+    def __init__(self, homepage_url: str = "https://www.latimes.com/", remote_debugging_port: int = 9222) -> None:
         self.homepage_url: str = homepage_url
+        self.remote_debugging_port: int = remote_debugging_port
         self.logger = logging.getLogger(__name__)
 
+        # Session shared by the image downloads, so connections to the same host are reused.
+        # The connection pool is as large as the number of concurrent downloads.
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=IMAGE_DOWNLOAD_WORKERS, pool_maxsize=IMAGE_DOWNLOAD_WORKERS)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # Images are downloaded in the background while the browser keeps paginating.
+        self._image_downloader = ThreadPoolExecutor(max_workers=IMAGE_DOWNLOAD_WORKERS)
+
         self._driver: WebDriver | None = None
 
     @property
@@ -46,6 +144,21 @@ class LATimesScraper:
 
         return self._driver
 
+    def wait(self, timeout: float) -> WebDriverWait:
+        """Create a WebDriverWait on the driver that polls every WAIT_POLL_FREQUENCY seconds."""
+        return WebDriverWait(self.driver, timeout=timeout, poll_frequency=WAIT_POLL_FREQUENCY)
+
+    def wait_for_element_present(self, selector: str, timeout: float) -> None:
+        """Wait for an element matching the CSS selector to be present on the page.
+
+        Raises:
+            TimeoutException: If no element matching the selector is present after the timeout, in seconds.
+        """
+        found = self.driver.execute_async_script(WAIT_FOR_ELEMENT_PRESENT_JS, selector, timeout * 1000)
+
+        if not found:
+            raise TimeoutException(f"No element matching '{selector}' was present after {timeout} seconds.")
+
     def set_webdriver(self) -> None:
         """Set the webdriver to use for scraping. This method should be called before using the driver."""
         self._driver = start("Chrome", options=self.set_chrome_options())
@@ -60,9 +173,40 @@ class LATimesScraper:
         options.add_argument("--disable-web-security")
         options.add_argument("--start-maximized")
         options.add_argument("--window-size=1920,1080")
-        options.add_argument("--remote-debugging-port=9222")
+        options.add_argument(f"--remote-debugging-port={self.remote_debugging_port}")
         options.add_argument("--disable-dev-shm-usage")
         options.add_experimental_option("excludeSwitches", ["enable-logging"])
+
+        # Turn off background subsystems the scraper never uses, which take CPU and memory on every page load.
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-renderer-backgrounding")
+        options.add_argument("--disable-client-side-phishing-detection")
+        options.add_argument("--disable-component-update")
+        options.add_argument("--disable-default-apps")
+        options.add_argument("--disable-sync")
+        options.add_argument("--metrics-recording-only")
+        options.add_argument("--mute-audio")
+        options.add_argument("--no-first-run")
+        # Chrome only honours the last --disable-features switch, so all the features are disabled in a single one.
+        options.add_argument("--disable-features=Translate,BackForwardCache,AcceptCHFrame,MediaRouter")
+
+        # Keep the LA Times scripts, styles and fonts in a disk cache that outlives the browser, so they are not
+        # downloaded again by the next runs. Browsers on different debugging ports get different caches.
+        cache_dir = Path(tempfile.gettempdir()) / f"latimes_scraper_chrome_cache_{self.remote_debugging_port}"
+        options.add_argument(f"--disk-cache-dir={cache_dir}")
+        options.add_argument(f"--disk-cache-size={CHROME_DISK_CACHE_SIZE}")
+
+        # The images are downloaded from the src attribute of the articles, so the browser does not need to load them.
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option(
+            "prefs",
+            {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2,
+                "profile.default_content_setting_values.geolocation": 2,
+            },
+        )
         return options
 
     def open_homepage(self) -> None:
@@ -79,13 +223,13 @@ class LATimesScraper:
         self.logger.info(f"Searching for: {search_query}")
 
         # First we need to wait for the magnify-icon data-element to be visible to click on it.
-        search_icon = WebDriverWait(self.driver, timeout=5).until(
+        search_icon = self.wait(timeout=5).until(
             EC.visibility_of_element_located((By.CSS_SELECTOR, "svg[data-element='magnify-icon']"))
         )
         search_icon.click()
 
         # Then we wait for the search input field, write the search query on it and submit the form.
-        search_input = WebDriverWait(self.driver, timeout=5).until(
+        search_input = self.wait(timeout=5).until(
             EC.visibility_of_element_located((By.CSS_SELECTOR, "input[data-element='search-form-input']"))
         )
         search_input.click()
@@ -107,30 +251,35 @@ class LATimesScraper:
         self.logger.info(f"Filtering by category: {category}")
 
         # Wait for the "see all categories" button to be visible and click on it.
-        see_all_button = WebDriverWait(self.driver, timeout=5).until(
+        see_all_button = self.wait(timeout=5).until(
             EC.visibility_of_element_located((By.CSS_SELECTOR, ".see-all-button"))
         )
         see_all_button.click()
 
         # Wait for the categories to be visible
-        categories = WebDriverWait(self.driver, timeout=5).until(
+        categories = self.wait(timeout=5).until(
             EC.visibility_of_all_elements_located(
                 (By.CSS_SELECTOR, ".search-filter-menu[data-name=Topics] > li .checkbox-input-label")
             )
         )
 
+        # Read the labels of all the categories, lowercased and stripped.
+        labels = self.driver.execute_script(
+            "return Array.from(arguments[0]).map((label) => label.textContent.toLowerCase().trim());", categories
+        )
+
         # Click on the category specified in the argument, if found.
-        clicked = False
-        for cat in categories:
-            if cat.get_attribute("textContent").lower().strip() == category.lower().strip():
-                cat.click()
-                clicked = True
-                break
+        try:
+            category_index = labels.index(category.lower().strip())
+        except ValueError:
+            category_index = None
+        else:
+            categories[category_index].click()
 
         # If the category was found, we wait for the reset button to be visible.
-        if clicked:
+        if category_index is not None:
             # now we wait for the reset button to be visible
-            WebDriverWait(self.driver, timeout=3).until(
+            self.wait(timeout=3).until(
                 EC.visibility_of_element_located((By.CSS_SELECTOR, ".search-results-module-filters-selected-reset"))
             )
 
@@ -138,50 +287,75 @@ class LATimesScraper:
         else:
             self.logger.warning(f"Category '{category}' not found. Continuing without filtering.")
 
-    def get_news(self, min_date: int) -> list[Article]:
+    def select_option_by_text(self, select: WebElement, text: str) -> None:
+        """Select the option of a select element by its text and notify the page of the change.
+
+        Raises:
+            NoSuchElementException: If the select element has no option with the given text.
+        """
+        selected = self.driver.execute_script(SELECT_OPTION_BY_TEXT_JS, select, text)
+
+        if not selected:
+            raise NoSuchElementException(f"Could not locate element with visible text: {text}")
+
+    def get_news(self, min_date: date) -> list[Article]:
         """Get news articles from the search results page, up to a certain date, sorted by newest.
 
         Args:
-            min_date (int): The minimum date for the articles to be included.
+            min_date (date): The minimum date for the articles to be included.
+                Articles published in the same month as min_date are included.
         """
 
+        # Articles published before the start of the minimum month are not included.
+        min_published_at = datetime(min_date.year, min_date.month, 1, tzinfo=UTC)
+
         # Wait for element with the news articles to be visible
-        search_results = WebDriverWait(self.driver, timeout=5).until(
+        search_results = self.wait(timeout=5).until(
             EC.visibility_of_element_located((By.CSS_SELECTOR, ".search-results-module-results-menu"))
         )
 
         # Wait for the sort by dropdown to be visible and select "Newest"
-        sort_by_newest_select = WebDriverWait(self.driver, timeout=5).until(
+        sort_by_newest_select = self.wait(timeout=5).until(
             EC.visibility_of_element_located((By.CSS_SELECTOR, ".search-results-module-sorts select"))
         )
-        Select(sort_by_newest_select).select_by_visible_text("Newest")
+        self.select_option_by_text(sort_by_newest_select, "Newest")
 
         # Wait for the search results to be stale, meaning that the page loaded the articles sorted by newest.
-        WebDriverWait(self.driver, timeout=5).until(EC.staleness_of(search_results))
+        self.wait(timeout=5).until(EC.staleness_of(search_results))
 
-        news = set()
+        # Articles by their key, so an article found again on a later page is not duplicated.
+        # Each article is mapped to the download of its image, which returns the article with its image_filepath.
+        news: dict[tuple[str, datetime], Future[Article]] = {}
 
         # Loop through the pages of the search results
         # until we reach the minimum date or there are no more pages.
         while True:
             should_stop_pagination = False
-            should_refetch_articles = False
 
             articles = self.fetch_articles_on_page_and_make_sure_they_are_not_stale()
 
-            for article_webelement in articles:
+            # Read the fields of every article on the page at once.
+            # If the page changed in the meantime, the articles are stale and we refetch them.
+            try:
+                articles_fields = self.extract_articles_fields(articles)
+            except StaleElementReferenceException:
+                continue
+
+            for article_webelement, article_fields in zip(articles, articles_fields):
                 try:
                     # parse the article
-                    article = self.parse_article(article_webelement)
+                    article = self.parse_article(article_fields)
 
                     # if the article is older than the minimum date, we stop the loop
                     # and flag the should_break variable to True, so we can break the outer loop.
-                    if article.publication_month < min_date:
+                    if article.published_at < min_published_at:
                         should_stop_pagination = True
                         break
 
-                    # append the article to the news list if it's not older than the minimum date.
-                    news.add(article)
+                    # add the article to the news if it's not older than the minimum date,
+                    # and start downloading its image.
+                    if article.key not in news:
+                        news[article.key] = self._image_downloader.submit(self.download_article_image, article)
 
                 # if an error occurs while parsing the article, we log the error and continue to the next article.
                 except ArticleParseError:
@@ -192,13 +366,6 @@ class LATimesScraper:
                         "An error occurred while parsing an article", exc_info=True, extra={"screenshot": filepath}
                     )
 
-                except StaleElementReferenceException:
-                    should_refetch_articles = True
-
-            # if the should_refetch_articles variable is True, we restart the loop.
-            if should_refetch_articles:
-                continue
-
             # if the should_stop_pagination variable is True, we break the loop.
             if should_stop_pagination:
                 break
@@ -209,7 +376,10 @@ class LATimesScraper:
             if not next_page_found:
                 break
 
-        return sorted(news, key=lambda x: x.published_at, reverse=True)
+        # Wait for the remaining image downloads.
+        articles = [download.result() for download in news.values()]
+
+        return sorted(articles, key=lambda x: x.published_at, reverse=True)
 
     # add function to go to next page if it is possible and if it is not let the caller know
     def go_to_next_page(self) -> bool:
@@ -218,58 +388,75 @@ class LATimesScraper:
         Returns:
             bool: True if the next page was found and clicked, False otherwise.
         """
-        next_page_buttons = self.driver.find_elements(By.CSS_SELECTOR, ".search-results-module-next-page")
+        # Find the next page button, check if it is active and find the current search results, in a single call.
+        n_next_page_buttons, next_page_button, search_results = self.driver.execute_script(FIND_NEXT_PAGE_BUTTON_JS)
 
-        if not next_page_buttons:
+        if not n_next_page_buttons:
             return False
 
-        assert len(next_page_buttons) == 1, "More than one next page button found"
-
-        next_page_button = next_page_buttons[0]
+        assert n_next_page_buttons == 1, "More than one next page button found"
 
-        if next_page_button.find_element(By.TAG_NAME, "svg").get_dom_attribute("data-inactive"):
+        if next_page_button is None:
             return False
 
         try:
             next_page_button.click()
-            return True
         except ElementClickInterceptedException:
             return False
 
-    def fetch_articles_on_page_and_make_sure_they_are_not_stale(self) -> list[WebElement]:
+        # Wait for the search results to be stale, meaning that the next page was loaded.
+        self.wait(timeout=5).until(EC.staleness_of(search_results))
+        return True
+
+    def fetch_articles_on_page_and_make_sure_they_are_not_stale(self, max_attempts: int = 5) -> list[WebElement]:
         """Fetch the articles on the page and make sure they are not stale.
 
+        Args:
+            max_attempts (int, optional): The maximum number of times the articles are fetched. Defaults to 5.
+
         Returns:
             list[WebElement]: The list of articles on the page.
+
+        Raises:
+            StaleElementReferenceException: If the articles are still stale after max_attempts fetches.
         """
-        articles = WebDriverWait(self.driver, timeout=5).until(
-            EC.visibility_of_all_elements_located((By.CSS_SELECTOR, ".search-results-module-results-menu > li"))
-        )
+        selector = ".search-results-module-results-menu > li"
 
-        if is_there_any_stale_web_element(articles):
-            return self.fetch_articles_on_page_and_make_sure_they_are_not_stale()
+        for _ in range(max_attempts):
+            self.wait_for_element_present(selector, timeout=5)
+            articles = self.driver.find_elements(By.CSS_SELECTOR, selector)
 
-        return articles
+            if not is_there_any_stale_web_element(articles):
+                return articles
 
-    def parse_article(self, article: WebElement) -> Article:
-        """Parse an article from the search results page.
+            # Give the page a moment to finish replacing the articles before fetching them again.
+            time.sleep(0.2)
+
+        msg = f"The articles on the page are still stale after {max_attempts} attempts."
+        self.logger.error(msg)
+        raise StaleElementReferenceException(msg)
+
+    def parse_article(self, article_fields: dict[str, str | None]) -> Article:
+        """Parse an article from the fields extracted from the search results page.
 
         Args:
-            article (WebElement): The WebElement representing the article.
+            article_fields (dict[str, str | None]): The fields of the article, as returned by extract_articles_fields.
 
         Returns:
             Article: The parsed article.
         """
 
-        category = self.extract_article_category(article)
-        title = self.extract_article_title(article)
-        description = self.extract_description(article)
-        date = self.extract_article_date(article)
-        image_url = self.extract_image_url(article)
-        image_filepath = None
+        category = article_fields["category"]
+        title = article_fields["title"]
+        description = article_fields["description"]
+        published_at = self.parse_article_date(article_fields["timestamp"])
+        image_url = article_fields["image_url"]
+
+        if category is None:
+            self.logger.error("No category found for the article")
 
-        if image_url:
-            image_filepath = self.download_image(image_url)
+        if image_url is None:
+            self.logger.warning("No image found for the article")
 
         # if the title or description is not found, we raise an error.
         if not title or not description:
@@ -278,64 +465,47 @@ class LATimesScraper:
         return Article(
             title=title,
             description=description,
-            published_at=date,
+            published_at=published_at,
             category=category,
             image_url=image_url,
-            image_filepath=image_filepath,
         )
 
-    def extract_article_category(self, article: WebElement) -> str | None:
-        """Extract the category of an article."""
-        try:
-            return article.find_element(By.CSS_SELECTOR, ".promo-category").text
-        except NoSuchElementException:
-            self.logger.error("No category found for the article")
-            return None
+    def extract_articles_fields(self, articles: list[WebElement]) -> list[dict[str, str | None]]:
+        """Extract the category, title, description, timestamp and image URL of the articles.
 
-    def extract_article_title(self, article: WebElement) -> str | None:
-        """Extract the title of an article."""
-        try:
-            return article.find_element(By.CSS_SELECTOR, ".promo-title").text
-        except NoSuchElementException:
-            self.logger.error("No title found for the article")
-            return None
+        Fields that are not found are returned as None.
 
-    def extract_description(self, article: WebElement) -> str | None:
-        """Extract the description of an article."""
-        try:
-            return article.find_element(By.CSS_SELECTOR, ".promo-description").text
-        except NoSuchElementException:
-            self.logger.error("No description found for the article")
-            return None
+        Raises:
+            StaleElementReferenceException: If any of the articles is no longer attached to the page.
+        """
+        return self.driver.execute_script(
+            f"return Array.from(arguments[0]).map({EXTRACT_ARTICLE_FIELDS_JS});", articles
+        )
 
-    def extract_article_date(self, article: WebElement) -> datetime:
-        """Extract the date of an article. If the date is not found, return the minimum datetime."""
-        try:
-            timestamp_ns = article.find_element(By.CSS_SELECTOR, ".promo-timestamp").get_dom_attribute("data-timestamp")
-            return datetime.fromtimestamp(int(timestamp_ns) / 1000, ZoneInfo("UTC"))
-        except NoSuchElementException:
+    def parse_article_date(self, timestamp_ms: str | None) -> datetime:
+        """Parse the date of an article from its timestamp in milliseconds.
+
+        If the timestamp is not found, return the minimum datetime, in UTC.
+        """
+        if timestamp_ms is None:
             self.logger.error("No date found for the article")
-            return datetime.min
+            return datetime.min.replace(tzinfo=UTC)
 
-    def extract_image_url(self, article: WebElement) -> str | None:
-        """Extract the URL of the image of an article."""
-        try:
-            return article.find_element(By.CSS_SELECTOR, "img").get_dom_attribute("src")
-        except NoSuchElementException:
-            self.logger.warning("No image found for the article")
-            return None
+        return datetime.fromtimestamp(int(timestamp_ms) / 1000, UTC)
 
     def generate_random_filename(self, length: int = 8) -> str:
         """Generate a random filename with a given length."""
-        return "".join(random.choices(string.ascii_letters + string.digits, k=length))
+        return secrets.token_urlsafe(length)[:length]
 
     def download_image(self, image_url: str, folderpath: str = None) -> str:
-        """Download a image from a URL and save it to a file with a random name.
+        """Download a image from a URL and save it to a file named after the hash of the URL.
+
+        If the image of the same URL was already downloaded to the folder, it is not downloaded again.
 
         Args:
             image_url (str): The URL of the image to download.
             folderpath (str, optional): The folder where the image will be saved. Defaults to None.
-            if folderpath is None, the image will be saved in the output/imgs folder.
+            if folderpath is None, the image will be saved in the output folder.
 
         Returns:
             str: The path to the downloaded image.
@@ -347,22 +517,46 @@ class LATimesScraper:
 
         folderpath = folderpath or "output"
 
-        response = requests.get(image_url, stream=True)
-        response.raise_for_status()
+        url_hash = hashlib.sha1(image_url.encode()).hexdigest()[:16]
+        file = Path(folderpath) / f"image_{url_hash}.{extension}"
 
-        random_filename = self.generate_random_filename()
+        if file.exists():
+            return str(file)
 
-        folder = Path(folderpath)
-        folder.mkdir(parents=True, exist_ok=True)
+        # The response is closed on the way out, so a failed download does not keep a streamed connection checked out.
+        with self._session.get(image_url, stream=True, timeout=IMAGE_DOWNLOAD_TIMEOUT) as response:
+            response.raise_for_status()
 
-        file = folder / f"image_{random_filename}.{extension}"
-        with file.open("wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+            file.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write to a temporary file first, so a partially downloaded image is never taken as already downloaded.
+            temporary_file = file.with_name(f"{file.name}.{self.generate_random_filename()}.part")
+
+            # Copy the raw response stream straight to the file, decoding any gzip/deflate content encoding.
+            response.raw.decode_content = True
+            try:
+                with temporary_file.open("wb") as f:
+                    shutil.copyfileobj(response.raw, f, length=65536)
+            except BaseException:
+                # Do not leave the partial file behind in the output folder, which is uploaded as artifacts.
+                temporary_file.unlink(missing_ok=True)
+                raise
+
+        temporary_file.replace(file)
 
         return str(file)
 
+    def download_article_image(self, article: Article) -> Article:
+        """Download the image of an article, if any, and return a copy of the article with its image_filepath set."""
+        if not article.image_url:
+            return article
+
+        return replace(article, image_filepath=self.download_image(article.image_url))
+
     def driver_quit(self):
-        """Quit the webdriver."""
+        """Quit the webdriver, stop the image downloads and close their session."""
         if self._driver:
             self._driver.quit()
+
+        self._image_downloader.shutdown(cancel_futures=True)
+        self._session.close()
@@ -0,0 +1,72 @@
+import io
+
+import pytest
+
+from scraper import LATimesScraper
+
+
+class StubResponse:
+    def __init__(self, raw: io.RawIOBase) -> None:
+        self.raw = raw
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+
+class StubSession:
+    def __init__(self, raw_factory) -> None:
+        self.raw_factory = raw_factory
+        self.requested_urls = []
+
+    def get(self, url, **kwargs):
+        self.requested_urls.append(url)
+        return StubResponse(self.raw_factory())
+
+    def close(self):
+        pass
+
+
+class FailingRaw(io.BytesIO):
+    """Raw response stream that fails after the first chunk, like a read timeout mid-download."""
+
+    def read(self, size=-1):
+        if self.tell():
+            raise TimeoutError("Read timed out")
+        return super().read(1)
+
+
+@pytest.fixture
+def scraper():
+    scraper = LATimesScraper()
+    yield scraper
+    scraper.driver_quit()
+
+
+def test_download_image(scraper, tmp_path):
+    scraper._session = StubSession(lambda: io.BytesIO(b"image"))
+    image_url = "https://example.com/images/photo.PNG"
+
+    filepath = scraper.download_image(image_url, folderpath=str(tmp_path))
+
+    assert filepath == scraper.download_image(image_url, folderpath=str(tmp_path))
+    assert filepath.startswith(str(tmp_path / "image_")) and filepath.endswith(".png")
+    assert open(filepath, "rb").read() == b"image"
+
+    # The second call found the downloaded image and made no request
+    assert scraper._session.requested_urls == [image_url]
+    assert [path.name for path in tmp_path.iterdir()] == [filepath.rsplit("/", 1)[-1]]
+
+
+def test_download_image_failure_leaves_no_partial_file(scraper, tmp_path):
+    scraper._session = StubSession(lambda: FailingRaw(b"image"))
+
+    with pytest.raises(TimeoutError):
+        scraper.download_image("https://example.com/images/photo.jpg", folderpath=str(tmp_path))
+
+    assert list(tmp_path.iterdir()) == []
@@ -4,13 +4,16 @@ from typing import Any
 from dateutil.relativedelta import relativedelta
 from robocorp import workitems
 from robocorp.tasks import task
-from RPA.Excel.Files import Files
+import xlsxwriter
 from zoneinfo import ZoneInfo
 
 from models import Article, OutputRow
 from scraper import LATimesScraper
 from utilities import is_empty_string, is_not_string
 
+# Timezone of the current month, from which the search months are counted.
+UTC = ZoneInfo("UTC")
+
 
 def validate_input_payload(payload: dict) -> tuple[bool, str]:
     """Validate the input payload.
@@ -59,53 +62,57 @@ def scrape_LA_times():
                     If not provided, the current month is considered.
     """
 
-    for order, item in enumerate(workitems.inputs):
-        # Validate the input payload
-        valid, error_message = validate_input_payload(item.payload)
-        if not valid:
-            workitems.outputs.create(payload={"status": "error", "error": error_message})
-            item.fail("BUSINESS", message=error_message)
-            continue
-
-        search_query = item.payload.get("search_query")
-        category = item.payload.get("category")
-        n_months = int(item.payload.get("months") or 1)
-
-        # Ensure that the number of months is at least 1 (current month)
-        n_months = max(n_months, 1)
-
-        # Get the latest news based on the search query, category, and number of months.
-        news = get_la_times_latest_news(search_query, category, n_months)
-
-        # Create output rows to be saved in an Excel file.
-        output_rows = create_output_rows(news, search_query, category, n_months)
-
-        # Save the output rows in an Excel file.
-        excel_output_filepath = f"output/search_results_{order}.xlsx"
-
-        excel = Files()
-        excel.create_workbook(excel_output_filepath)
-        excel.append_rows_to_worksheet(content=[row.to_dict() for row in output_rows], header=True)
-        excel.save_workbook()
-
-        # Create workitem outputs
-        image_files = [row.picture_filename for row in output_rows if row.picture_filename]
-        workitems.outputs.create(
-            payload={
-                "status": "success",
-                "excel_output_filepath": excel_output_filepath,
-                "search_query": search_query,
-                "category": category,
-                "months": n_months,
-                "image_files": image_files,
-            },
-            files=[excel_output_filepath] + image_files,
-        )
+    # A single browser is shared by all the work items.
+    scraper = LATimesScraper()
+    scraper.set_webdriver()
+
+    try:
+        for order, item in enumerate(workitems.inputs):
+            # Validate the input payload
+            valid, error_message = validate_input_payload(item.payload)
+            if not valid:
+                workitems.outputs.create(payload={"status": "error", "error": error_message})
+                item.fail("BUSINESS", message=error_message)
+                continue
+
+            search_query = item.payload.get("search_query")
+            category = item.payload.get("category")
+            n_months = int(item.payload.get("months") or 1)
+
+            # Ensure that the number of months is at least 1 (current month)
+            n_months = max(n_months, 1)
+
+            # Get the latest news based on the search query, category, and number of months.
+            news = get_la_times_latest_news(scraper, search_query, category, n_months)
+
+            # Create output rows to be saved in an Excel file.
+            output_rows = create_output_rows(news, search_query, category, n_months)
+
+            # Save the output rows in an Excel file.
+            excel_output_filepath = f"output/search_results_{order}.xlsx"
+
+            save_output_rows_to_excel(output_rows, excel_output_filepath)
+
+            # Create workitem outputs
+            image_files = [row.picture_filename for row in output_rows if row.picture_filename]
+            workitems.outputs.create(
+                payload={
+                    "status": "success",
+                    "excel_output_filepath": excel_output_filepath,
+                    "search_query": search_query,
+                    "category": category,
+                    "months": n_months,
+                    "image_files": image_files,
+                },
+                files=[excel_output_filepath] + image_files,
+            )
+    finally:
+        scraper.driver_quit()
 
 
 def compute_minimum_publication_date(n_months: int) -> date:
     """Compute the minimum date for the search based on the number of months."""
-    current_month = datetime.now(ZoneInfo("UTC")).date().replace(day=1)
+    current_month = datetime.now(UTC).date().replace(day=1)
     return current_month - relativedelta(months=(n_months - 1))
 
 
@@ -134,10 +141,31 @@ def create_output_rows(articles: list[Article], search_query: str, category: str
     return output_rows
 
 
-def get_la_times_latest_news(search_query: str, category: str, n_months: int) -> list[Article]:
+def save_output_rows_to_excel(output_rows: list[OutputRow], filepath: str) -> None:
+    """Save the output rows in an Excel file, with a header row.
+
+    Args:
+        output_rows (list[OutputRow]): The output rows to save.
+        filepath (str): The path of the Excel file.
+    """
+    workbook = xlsxwriter.Workbook(filepath, {"constant_memory": True, "strings_to_urls": False})
+    worksheet = workbook.add_worksheet()
+
+    worksheet.write_row(0, 0, OutputRow.HEADER)
+
+    for row_number, output_row in enumerate(output_rows, start=1):
+        worksheet.write_row(row_number, 0, output_row.to_row())
+
+    workbook.close()
+
+
+def get_la_times_latest_news(scraper: LATimesScraper, search_query: str, category: str, n_months: int) -> list[Article]:
     """Get the latest news based on the search query, category, and number of months.
 
+    The search starts from the homepage, so the same scraper can be used for several searches.
+
     Args:
+        scraper (LATimesScraper): The scraper to use, with its webdriver already set.
         search_query (str): The search query to use.
         category (str): The category to filter the news.
         n_months (int): The number of months to consider.
@@ -145,17 +173,9 @@ def get_la_times_latest_news(search_query: str, category: str, n_months: int) ->
     Returns:
         list[Article]: The list of articles found.
     """
-    scraper = LATimesScraper()
-
-    scraper.set_webdriver()
-
     scraper.open_homepage()
     scraper.search_for(search_query)
     scraper.filter_by_category(category)
 
     min_date = compute_minimum_publication_date(n_months)
-    news = scraper.get_news(min_date)
-
-    scraper.driver_quit()
-
-    return news
+    return scraper.get_news(min_date)
@@ -0,0 +1,50 @@
+from datetime import date
+
+from openpyxl import load_workbook
+
+from models import OutputRow
+from tasks import save_output_rows_to_excel
+
+
+def make_output_row(**kwargs) -> OutputRow:
+    fields = {
+        "title": "Title",
+        "date": date(2024, 8, 15),
+        "description": "Description",
+        "picture_filename": "output/image.jpg",
+        "search_phrase_count": 2,
+        "contains_money": True,
+        "search_query": "meal",
+        "category": None,
+        "months": 1,
+    }
+    fields.update(kwargs)
+    return OutputRow(**fields)
+
+
+def read_excel_rows(filepath) -> list[tuple]:
+    return list(load_workbook(filepath).active.iter_rows(values_only=True))
+
+
+def test_save_output_rows_to_excel(tmp_path):
+    filepath = tmp_path / "search_results.xlsx"
+    output_rows = [
+        make_output_row(),
+        make_output_row(title="Another title", contains_money=False, category="Food"),
+    ]
+
+    save_output_rows_to_excel(output_rows, str(filepath))
+
+    assert read_excel_rows(filepath) == [
+        OutputRow.HEADER,
+        ("Title", "2024-08-15", "Description", "output/image.jpg", 2, True, "meal", None, 1),
+        ("Another title", "2024-08-15", "Description", "output/image.jpg", 2, False, "meal", "Food", 1),
+    ]
+
+
+def test_save_output_rows_to_excel_without_rows(tmp_path):
+    filepath = tmp_path / "search_results.xlsx"
+
+    save_output_rows_to_excel([], str(filepath))
+
+    assert read_excel_rows(filepath) == [OutputRow.HEADER]
@@ -1,9 +1,30 @@
 import re
+from functools import lru_cache
 
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.common.exceptions import StaleElementReferenceException
 
 
+# regex for numbers with 1 or 2 decimal places and thousands separator
+# matches: 1 | 11 | 111 | 1.1 | 11.1 | 111.1 | 1,111.1 | 11,111.11
+NUMBERS = r"\d{1,3}(?:,\d{3})*(?:\.\d{1,2})?"
+
+# currencies that can be written after a money amount, as in: 11 dollars | 11 USD
+MONEY_CURRENCIES = ("dollars", "USD")
+
+
+@lru_cache(maxsize=32)
+def compile_money_amount_re(currencies: tuple[str, ...]) -> re.Pattern:
+    """Compile the regex for money amounts, written as $11.1 or as 11 followed by one of the currencies."""
+    alternatives = "|".join(re.escape(currency) for currency in currencies)
+    return re.compile(rf"\${NUMBERS}|{NUMBERS}\s?(?:{alternatives})", re.IGNORECASE)
+
+
+# regex for money amounts, compiled once at import time and scanning the text in a single pass
+# possible formats: $11.1 | $111,111.11 | 11 dollars | 11 USD
+MONEY_AMOUNT_RE = compile_money_amount_re(MONEY_CURRENCIES)
+
+
 def is_there_any_money_amount(text: str) -> bool:
     """Check if there is any money amount in the text.
 
@@ -27,24 +48,15 @@ def is_there_any_money_amount(text: str) -> bool:
         >>> is_there_any_money_amount("The price is 11")
         False
     """
-    # boolean to check if there is any money amount in the article
-    # possible formats: $11.1 | $111,111.11 | 11 dollars | 11 USD
+    # Every money amount has a "$", "dollars" or "USD" in it. Texts with none of them are ruled out with substring
+    # checks, which are much cheaper than the regex search. For these currencies, casefold matches the
+    # case-insensitive regex semantics.
+    if "$" not in text:
+        casefolded_text = text.casefold()
+        if "dollars" not in casefolded_text and "usd" not in casefolded_text:
+            return False
 
-    # regex for numbers with 1 or 2 decimal places and thousands separator
-    # matches: 1 | 11 | 111 | 1.1 | 11.1 | 111.1 | 1,111.1 | 11,111.11
-    NUMBERS = r"\d{1,3}(,\d{3})*(\.\d{1,2})?"
-
-    # regex for money amounts
-    dollar_first = re.compile(rf"\${NUMBERS}")
-    dollar_last = re.compile(rf"{NUMBERS}\s?dollars", re.IGNORECASE)
-    usd = re.compile(rf"{NUMBERS}\s?USD", re.IGNORECASE)
-
-    money_amount = False
-    money_amount |= bool(dollar_first.search(text))
-    money_amount |= bool(dollar_last.search(text))
-    money_amount |= bool(usd.search(text))
-
-    return money_amount
+    return MONEY_AMOUNT_RE.search(text) is not None
 
 
 def count_search_query(text: str, search_query: str) -> int:
@@ -56,26 +68,18 @@ def count_search_query(text: str, search_query: str) -> int:
 
 def is_there_any_stale_web_element(web_elements: list[WebElement]) -> bool:
     """Check if there is any stale web element in the list of web elements."""
-    for web_element in web_elements:
-        if is_web_element_stale(web_element):
-            return True
+    if not web_elements:
+        return False
 
-    return False
-
-
-def is_web_element_stale(web_element: WebElement) -> bool:
-    """Check if the web element is stale."""
+    driver = web_elements[0].parent
     try:
-        if not web_element.is_enabled():
-            return True
+        return driver.execute_script("return Array.from(arguments[0]).some((e) => !e.isConnected);", web_elements)
     except StaleElementReferenceException:
         return True
 
-    return False
-
 
 def string_has_value(value: str) -> bool:
-    return isinstance(value, str) and value.strip()
+    return isinstance(value, str) and not is_empty_string(value)
 
 
 def is_not_string(value) -> bool:
@@ -83,4 +87,4 @@ def is_not_string(value) -> bool:
 
 
 def is_empty_string(value: str) -> bool:
-    return not value.strip()
+    return not value or value.isspace()
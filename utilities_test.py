@@ -1,4 +1,12 @@
-from utilities import count_search_query, is_there_any_money_amount
+from utilities import (
+    MONEY_AMOUNT_RE,
+    MONEY_CURRENCIES,
+    compile_money_amount_re,
+    count_search_query,
+    is_empty_string,
+    is_there_any_money_amount,
+    string_has_value,
+)
 
 
 def test_valid_money_amounts():
@@ -7,6 +15,8 @@ def test_valid_money_amounts():
     assert is_there_any_money_amount("The price is 11 dollars")
     assert is_there_any_money_amount("The cost is 11 USD")
     assert is_there_any_money_amount("Price: $0.99")
+    assert is_there_any_money_amount("The price is 11 DOLLARS")
+    assert is_there_any_money_amount("The cost is 1,000 usd")
 
 
 def test_invalid_money_amounts():
@@ -23,6 +33,24 @@ def test_edge_cases():
     assert is_there_any_money_amount("Price is $10000")
     assert is_there_any_money_amount("The price is $123,456.78, that's a lot!")
     assert is_there_any_money_amount("The cost of the item is 50 USD. Is it enough?")
+    assert not is_there_any_money_amount("50 reasons to save dollars")
+    assert not is_there_any_money_amount("USD is up 2%")
+
+
+def test_compile_money_amount_re():
+    money_amount_re = compile_money_amount_re(("euros", "EUR"))
+
+    assert money_amount_re.search("The price is 11 euros")
+    assert money_amount_re.search("The cost is 1,000.50 eur")
+    assert money_amount_re.search("The price is $11.1")
+    assert not money_amount_re.search("The price is 11 dollars")
+
+    # Currencies are matched case-insensitively by the regex alone, with no casefold prefilter
+    assert compile_money_amount_re(("lira",)).search("10 L\u0130RA")
+
+    # Compiled once for each tuple of currencies
+    assert compile_money_amount_re(("euros", "EUR")) is money_amount_re
+    assert compile_money_amount_re(MONEY_CURRENCIES) is MONEY_AMOUNT_RE
 
 
 def test_count_search_query():
@@ -57,3 +85,22 @@ def test_count_search_query():
     # Case with a very long text and search query
     long_text = "word " * 1000  # "word" repeated 1000 times
     assert count_search_query(long_text, "word") == 1000
+
+
+def test_is_empty_string():
+    assert is_empty_string("")
+    assert is_empty_string(" ")
+    assert is_empty_string(" \t\n ")
+
+    assert not is_empty_string("meal")
+    assert not is_empty_string("  meal  ")
+
+
+def test_string_has_value():
+    assert string_has_value("meal")
+    assert string_has_value("  meal  ")
+
+    assert not string_has_value("")
+    assert not string_has_value(" \t\n ")
+    assert not string_has_value(None)
+    assert not string_has_value(1)